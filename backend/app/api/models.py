@@ -1,30 +1,41 @@
-from pydantic import BaseModel
 from typing import Optional, Dict, Any
 
-class FeaturedImage(BaseModel):
+import msgspec
+
+# Structs are decoded straight from JSON by msgspec instead of being
+# validated by Pydantic on every request. kw_only lets required fields
+# follow fields that have defaults.
+
+
+class FeaturedImage(msgspec.Struct, frozen=True, kw_only=True):
     url: str
     alt_text: Optional[str] = None
 
-    
-class ProductData(BaseModel):
-    """Product data for 3D generation."""
+
+class ProductData(msgspec.Struct, frozen=True, kw_only=True):
+    """Product data for 3D generation.
+
+    The image is either a URL in ``featured_image`` or the ``image_key`` of an
+    image uploaded to ``/api/product-image``.
+    """
 
     title: str
     description: Optional[str] = None
     product_type: Optional[str] = None
     tags: Optional[list[str]] = None
-    featured_image: FeaturedImage
+    featured_image: Optional[FeaturedImage] = None
+    image_key: Optional[str] = None
     id: Optional[str] = None
 
 
-class ShopTheme(BaseModel):
+class ShopTheme(msgspec.Struct, frozen=True, kw_only=True):
     """Shop theme configuration."""
 
     style: Optional[str] = "modern"
     colors: Optional[Dict[str, str]] = None
 
 
-class GenerateProduct3DRequest(BaseModel):
+class GenerateProduct3DRequest(msgspec.Struct, frozen=True, kw_only=True):
     """Request to generate a 3D product visualization."""
 
     product_data: ProductData
@@ -33,7 +44,14 @@ class GenerateProduct3DRequest(BaseModel):
     temperature: Optional[float] = 0.7
 
 
-class TaskResponse(BaseModel):
+class ImageUploadResponse(msgspec.Struct, kw_only=True):
+    """Response with the key of an uploaded product image."""
+
+    image_key: str
+    mime_type: str
+
+
+class TaskResponse(msgspec.Struct, kw_only=True):
     """Response with task information."""
 
     task_id: str
@@ -41,10 +59,21 @@ class TaskResponse(BaseModel):
     message: str
 
 
-class TaskResultResponse(BaseModel):
-    """Response with task result."""
+class TaskResultResponse(msgspec.Struct, kw_only=True):
+    """Response with task result.
+
+    Redis only holds the task status and a small pointer to the payload,
+    which lives in the payload store. ``result`` is only populated once the
+    task reaches a terminal status, ``has_payload`` tells clients whether it
+    is present, and ``payload_url`` serves the same payload as a file.
+    """
 
     task_id: str
     status: str
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
\ No newline at end of file
+    # The stored payload, embedded into the response as msgspec.Raw. Successful
+    # payloads carry a "kind" of "product", "scene" or "shop" to dispatch on
+    result: Any = None
+    has_payload: bool = False
+    payload_url: Optional[str] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
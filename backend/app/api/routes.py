@@ -1,23 +1,216 @@
 """FastAPI routes for Shoptimizer backend."""
 
+import asyncio
+import collections
+import hashlib
+import time
 import uuid
 from logging import Logger
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
-from app.api.models import GenerateProduct3DRequest, TaskResponse, TaskResultResponse
-from app.claude.scene_generation import ShopifyProductTo3DTask
+from app.api.models import (
+    GenerateProduct3DRequest,
+    ImageUploadResponse,
+    TaskResponse,
+    TaskResultResponse,
+)
+from app.utils.celery_app import celery_app
+from app.utils.events import QUEUE_OVERFLOW, task_events
 from app.utils.redis import redis_service
-from fastapi import APIRouter, HTTPException, status
+from app.utils.settings import settings
+from app.utils.storage import MAX_IMAGE_BYTES, image_store, payload_store
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+import msgspec
+import orjson
 
 router = APIRouter(prefix="/api", tags=["generation"])
 
+# Celery task name of shopify_product_to_3d_task; the API only needs the name, so
+# the Gemini task code stays out of the API process
+PRODUCT_TO_3D_TASK = "shopify_product_to_3d"
+
+# Statuses written by the worker once a task will not change anymore
+TERMINAL_STATUSES = ("success", "error")
+
+# Seconds between SSE comments that keep idle connections open through proxies
+SSE_KEEPALIVE_INTERVAL = 15
+
+# Seconds before a stream is closed; EventSource clients reconnect on their own
+SSE_MAX_STREAM_TIME = 30
 
-@router.post(
-    "/generate-product-3d",
-    response_model=TaskResponse,
-    status_code=status.HTTP_202_ACCEPTED,
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Disable buffering in nginx
+}
+
+# Preformatted first frame for tasks that have not started; only the
+# JSON-encoded task id is filled in per connection
+_SSE_QUEUED_FRAME = (
+    b'id: queued\ndata: {"status":"queued","message":"Task queued, processing...",'
+    b'"task_id":%b}\n\n'
 )
-async def generate_product_3d(request: GenerateProduct3DRequest) -> TaskResponse:
+
+# Admission control for long-lived connections: SSE streams and result waits
+_sse_slots = asyncio.Semaphore(settings.SSE_MAX_CONNECTIONS)
+_sse_per_client: collections.Counter = collections.Counter()
+SSE_MAX_PER_CLIENT = settings.SSE_MAX_PER_CLIENT
+
+
+async def _acquire_slot(client_host: str) -> bool:
+    """Take a long-lived connection slot, or False if none is free for the client."""
+    if _sse_slots.locked() or _sse_per_client[client_host] >= SSE_MAX_PER_CLIENT:
+        return False
+    # Never blocks since the semaphore is not locked
+    await _sse_slots.acquire()
+    _sse_per_client[client_host] += 1
+    return True
+
+
+def _release_slot(client_host: str) -> None:
+    """Give back a slot taken with _acquire_slot."""
+    _sse_slots.release()
+    _sse_per_client[client_host] -= 1
+    if _sse_per_client[client_host] <= 0:
+        del _sse_per_client[client_host]
+
+
+def _slots_exhausted() -> Response:
+    """Answer a long-lived request that found no free slot."""
+    return Response(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "5"},
+    )
+
+
+class _CleanupStreamingResponse(StreamingResponse):
+    """StreamingResponse that runs a cleanup even if its body never starts.
+
+    Starlette skips the body iterator when the client disconnects while the
+    response start is sent, so the generator's own finally may never run.
+    """
+
+    def __init__(self, content: Any, cleanup: Callable[[], None], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
+
+# Celery task states after which our worker cannot write a status anymore
+CELERY_FAILED_STATES = ("FAILURE", "REVOKED")
+
+# Longest a task result request may wait for the task to finish
+RESULT_MAX_WAIT = 25.0
+
+# Seconds a successful Redis ping is trusted by the health check
+HEALTH_PING_CACHE_TIME = 5.0
+_last_ping_ok: float = 0.0
+
+# Dedup locks expire no later than the payload of the task they point to
+DEDUP_LOCK_EXPIRY = 1800
+
+# Product images accepted as raw uploads
+IMAGE_MIME_TYPES = ("image/png", "image/jpeg")
+IMAGE_SIGNATURES = {"image/png": b"\x89PNG\r\n\x1a\n", "image/jpeg": b"\xff\xd8\xff"}
+
+
+async def _decode_generate_request(request: Request) -> GenerateProduct3DRequest:
+    """Decode and validate the request body directly into msgspec structs."""
+    try:
+        decoded = msgspec.json.decode(
+            await request.body(), type=GenerateProduct3DRequest
+        )
+    except msgspec.DecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    product = decoded.product_data
+    if product.featured_image is None and product.image_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="product_data needs a featured_image or an image_key",
+        )
+    return decoded
+
+
+def _struct_response(content: msgspec.Struct, status_code: int = 200) -> Response:
+    """Encode a msgspec struct into a JSON response."""
+    return Response(
+        content=msgspec.json.encode(content),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def _request_fingerprint(payload: Dict[str, Any]) -> str:
+    """Hash a canonical JSON form of the generation inputs."""
+    canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+def _sse_event(data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """Format a dict as an SSE data frame, tagged with an event id if given.
+
+    Status frames use the status itself as id, so a reconnecting client's
+    Last-Event-ID tells us which transition it has already seen.
+    """
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    if event_id is None:
+        return frame
+    return b"id: " + event_id.encode() + b"\n" + frame
+
+
+def _sse_payload(payload_json: Optional[str], task_status: str, task_id: str) -> bytes:
+    """Format a stored payload pointer as an SSE data frame without re-encoding it."""
+    if payload_json is None:
+        return _sse_event({"status": task_status, "task_id": task_id}, task_status)
+    return (
+        b"id: " + task_status.encode() + b"\ndata: " + payload_json.encode() + b"\n\n"
+    )
+
+
+def _celery_failure(celery_meta: Optional[str]) -> Optional[str]:
+    """Get the error of a task Celery recorded as failed or revoked, if it did."""
+    if not celery_meta:
+        return None
+    meta = orjson.loads(celery_meta)
+    if meta.get("status") not in CELERY_FAILED_STATES:
+        return None
+    exc = meta.get("result") or {}
+    if isinstance(exc, dict):
+        return f"{exc.get('exc_type', 'Error')}: {exc.get('exc_message', '')}"
+    return str(exc)
+
+
+async def _wait_for_terminal(queue: asyncio.Queue, timeout: float) -> Optional[str]:
+    """Wait on a task's event queue for a terminal status, or None on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        try:
+            task_status = await asyncio.wait_for(queue.get(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return None
+        if task_status in TERMINAL_STATUSES:
+            return task_status
+        if task_status == QUEUE_OVERFLOW:
+            return None
+
+
+@router.post("/generate-product-3d", status_code=status.HTTP_202_ACCEPTED)
+async def generate_product_3d(
+    request: GenerateProduct3DRequest = Depends(_decode_generate_request),
+) -> Response:
     """
     Queue a task to generate a 3D product visualization.
 
@@ -40,39 +233,93 @@ async def generate_product_3d(request: GenerateProduct3DRequest) -> TaskResponse
         task_id = str(uuid.uuid4())
 
         # Prepare product data dict
+        product = request.product_data
         product_dict = {
-            "id": request.product_data.id or task_id,
-            "title": request.product_data.title,
-            "description": request.product_data.description or "",
-            "product_type": request.product_data.product_type or "",
-            "tags": request.product_data.tags or [],
-            "image_url": request.product_data.featured_image.url,
+            "id": product.id,
+            "title": product.title,
+            "description": product.description or "",
+            "product_type": product.product_type or "",
+            "tags": product.tags or [],
         }
+        if product.image_key:
+            product_dict["image_key"] = product.image_key
+        else:
+            product_dict["image_url"] = product.featured_image.url
 
         # Prepare shop theme dict
         shop_theme = None
-        if request.shop_theme:
-            shop_theme = {
-                "style": request.shop_theme.style,
-                "colors": request.shop_theme.colors or {},
+        theme = request.shop_theme
+        if theme:
+            shop_theme = {"style": theme.style, "colors": theme.colors or {}}
+
+        # Identical requests share one generation; the lock maps the request
+        # fingerprint to the task that owns it
+        lock_key = "task_lock:" + _request_fingerprint(
+            {
+                "product_data": product_dict,
+                "shop_theme": shop_theme,
+                "max_tokens": request.max_tokens,
+                "temperature": request.temperature,
             }
-
-        # Create task instance and queue it
-        task = ShopifyProductTo3DTask
-        celery_task = task.apply_async(
-            args=(
-                task_id,
-                product_dict,
-                shop_theme,
-                request.max_tokens,
-                request.temperature,
-            )
+        )
+        owner_id = await redis_service.aclaim_lock(
+            lock_key, task_id, expiry=DEDUP_LOCK_EXPIRY
         )
 
-        return TaskResponse(
-            task_id=task_id,
-            status="queued",
-            message=f"Task {task_id} queued for processing",
+        if owner_id != task_id:
+            owner_status, owner_meta = await redis_service.aclient.mget(
+                f"task_status:{owner_id}", f"celery-task-meta-{owner_id}"
+            )
+            # A missing status means the owner expired, was cancelled or was
+            # never queued; a killed worker only shows up in Celery's meta
+            owner_alive = (
+                owner_status is not None
+                and owner_status != "error"
+                and _celery_failure(owner_meta) is None
+            )
+            if not owner_alive:
+                # Take over, unless a concurrent retry already has
+                owner_id = await redis_service.aclaim_lock(
+                    lock_key, task_id, expected_owner=owner_id, expiry=DEDUP_LOCK_EXPIRY
+                )
+            if owner_id != task_id:
+                return _struct_response(
+                    TaskResponse(
+                        task_id=owner_id,
+                        status="deduplicated",
+                        message=f"Task {owner_id} is already handling this request",
+                    ),
+                    status_code=status.HTTP_202_ACCEPTED,
+                )
+
+        product_dict["id"] = product_dict["id"] or task_id
+
+        # Queue by name; only the worker imports the task implementation
+        try:
+            celery_app.send_task(
+                PRODUCT_TO_3D_TASK,
+                args=(
+                    product_dict,
+                    shop_theme,
+                    request.max_tokens,
+                    request.temperature,
+                ),
+                task_id=task_id,
+            )
+        except Exception:
+            # Don't leave identical requests deduplicated to a task that
+            # never made it onto the queue
+            await redis_service.arelease_lock(task_id, lock_key)
+            await redis_service.aclient.delete(f"task_status:{task_id}")
+            raise
+
+        return _struct_response(
+            TaskResponse(
+                task_id=task_id,
+                status="queued",
+                message=f"Task {task_id} queued for processing",
+            ),
+            status_code=status.HTTP_202_ACCEPTED,
         )
 
     except Exception as e:
@@ -82,74 +329,191 @@ async def generate_product_3d(request: GenerateProduct3DRequest) -> TaskResponse
         )
 
 
-# SSE endpoint for frontend to retrieve value from Redis as workers
-@router.get("/task-stream/{task_id}")
-async def stream_task_result(task_id: str):
+@router.put("/product-image", status_code=status.HTTP_201_CREATED)
+async def upload_product_image(request: Request) -> Response:
     """
-    Stream task results via Server-Sent Events (SSE).
+    Upload a product image as the raw request body.
 
-    Client connects once and receives real-time updates as task progresses.
-    Connection closes automatically when task completes or fails.
-    """
+    The image is stored once, keyed by its content hash, and referenced from
+    a generation request through ``product_data.image_key``. The worker then
+    sends the bytes to Gemini as they are, rather than the image taking an
+    extra trip through base64 in the JSON request and Celery message.
 
-    async def event_generator():
-        # Poll Redis, but only send updates when status changes
-        previous_status = None
-        max_wait_time = 3600  # 1 hour timeout
-        start_time = asyncio.get_event_loop().time()
+    Raises:
+        HTTPException: If the image type is unsupported or it is too large
+    """
+    mime_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if mime_type not in IMAGE_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Images must be one of {', '.join(IMAGE_MIME_TYPES)}",
+        )
 
-        while True:
-            # Timeout check
-            if asyncio.get_event_loop().time() - start_time > max_wait_time:
-                yield f"data: {json.dumps({'status': 'timeout', 'message': 'Task timed out'})}\n\n"
-                break
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Images must be between 1 and {MAX_IMAGE_BYTES} bytes",
+    )
+    # Refuse a declared oversize body before reading any of it
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+        raise too_large
+
+    # Count while reading, since the declared length may be missing or wrong
+    image = bytearray()
+    async for chunk in request.stream():
+        image += chunk
+        if len(image) > MAX_IMAGE_BYTES:
+            raise too_large
+    if not image:
+        raise too_large
+    image = bytes(image)
+
+    # The worker sends the bytes to Gemini under this type, so don't trust
+    # the client's label alone
+    if not image.startswith(IMAGE_SIGNATURES[mime_type]):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Image content is not {mime_type}",
+        )
 
-            try:
-                # Get current result from Redis
-                result_json = redis_service.get_value(f"task_result:{task_id}")
+    image_key = hashlib.blake2b(image, digest_size=16).hexdigest()
+    await asyncio.to_thread(image_store.put, image_key, image)
 
-                if result_json:
-                    result = json.loads(result_json)
-                    current_status = result.get("status")
+    return _struct_response(
+        ImageUploadResponse(image_key=image_key, mime_type=mime_type),
+        status_code=status.HTTP_201_CREATED,
+    )
 
-                    # Only send if status changed or first time
-                    if current_status != previous_status:
-                        yield f"data: {json.dumps(result)}\n\n"
-                        previous_status = current_status
 
-                        # Close connection when task is done
-                        if current_status in ["completed", "failed"]:
-                            break
-                else:
-                    # Task not found yet (might be queuing)
-                    if previous_status is None:
-                        yield f"data: {json.dumps({'status': 'queued', 'message': 'Task queued, processing...', 'task_id': task_id})}\n\n"
-                        previous_status = "queued"
+# SSE endpoint for frontend to retrieve value from Redis as workers
+@router.get("/task-stream/{task_id}")
+async def stream_task_result(task_id: str, request: Request):
+    """
+    Stream task results via Server-Sent Events (SSE).
 
-                # Wait before checking again
-                await asyncio.sleep(0.5)
+    Client connects once and receives real-time updates as task progresses.
+    Connection closes automatically when task completes or fails, and
+    otherwise after a short time so idle clients reconnect with
+    Last-Event-ID. Returns 204 to stop reconnects once the client has seen
+    a terminal status, and 503 when the server or the client's address
+    already holds too many streams.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id in TERMINAL_STATUSES:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-            except Exception as e:
-                yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
-                break
+    # Register before reading the status so no transition can slip between
+    queue = task_events.subscribe(task_id)
+    try:
+        async with redis_service.apipeline() as pipe:
+            current_status, payload_json = await (
+                pipe.get(f"task_status:{task_id}")
+                .get(f"task_payload:{task_id}")
+                .execute()
+            )
+    except Exception:
+        task_events.unsubscribe(task_id, queue)
+        raise
+
+    # Finished tasks get their final frame without holding a stream slot
+    if current_status in TERMINAL_STATUSES:
+        task_events.unsubscribe(task_id, queue)
+        return Response(
+            content=_sse_payload(payload_json, current_status, task_id),
+            media_type="text/event-stream",
+            headers=_SSE_HEADERS,
+        )
 
-    return StreamingResponse(
-        event_generator(),
+    client_host = request.client.host if request.client else "unknown"
+    if not await _acquire_slot(client_host):
+        task_events.unsubscribe(task_id, queue)
+        return _slots_exhausted()
+
+    released = False
+
+    def release():
+        # Runs from both the generator and the response, whichever ends first
+        nonlocal released
+        if released:
+            return
+        released = True
+        task_events.unsubscribe(task_id, queue)
+        _release_slot(client_host)
+
+    async def event_generator(current_status: str):
+        # Wait on the shared dispatcher until the worker publishes a change
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SSE_MAX_STREAM_TIME
+
+        try:
+            # Skip the transition a reconnecting client has already seen
+            if current_status != last_event_id:
+                if current_status == "queued":
+                    yield _SSE_QUEUED_FRAME % orjson.dumps(task_id)
+                else:
+                    yield _sse_event(
+                        {"status": current_status, "task_id": task_id},
+                        current_status,
+                    )
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    current_status = await asyncio.wait_for(
+                        queue.get(), timeout=min(SSE_KEEPALIVE_INTERVAL, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+
+                # Fell too far behind; the client resyncs when it reconnects
+                if current_status == QUEUE_OVERFLOW:
+                    break
+
+                if current_status in TERMINAL_STATUSES:
+                    # Only the final transition carries the payload pointer
+                    payload_json = await redis_service.aget(
+                        f"task_payload:{task_id}"
+                    )
+                    yield _sse_payload(payload_json, current_status, task_id)
+                    break
+
+                yield _sse_event(
+                    {"status": current_status, "task_id": task_id}, current_status
+                )
+
+        except Exception as e:
+            yield _sse_event({"status": "error", "message": str(e)})
+
+        finally:
+            release()
+
+    return _CleanupStreamingResponse(
+        event_generator(current_status or "queued"),
+        cleanup=release,
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",  # Disable buffering in nginx
-        },
+        headers=_SSE_HEADERS,
     )
 
 
-@router.get("/task-result/{task_id}", response_model=TaskResultResponse)
-async def get_task_result(task_id: str) -> TaskResultResponse:
+@router.get("/task-result/{task_id}")
+async def get_task_result(task_id: str, request: Request, wait: float = 0) -> Response:
     """
     Retrieve the result of a 3D product generation task.
 
+    With ``wait``, an unfinished task is long-polled: the request blocks on
+    the task's status events for up to that many seconds (capped at
+    RESULT_MAX_WAIT) instead of the client polling again. Waiting takes one
+    of the connection slots SSE streams use, and is refused with 503 while
+    none is free.
+
     Args:
         task_id: The ID of the task to retrieve
+        request: The incoming request, whose client address a wait counts against
+        wait: Seconds to wait for the task to finish before answering pending
 
     Returns:
         TaskResultResponse with the task status and result (if available)
@@ -157,27 +521,63 @@ async def get_task_result(task_id: str) -> TaskResultResponse:
     Raises:
         HTTPException: If task_id is invalid
     """
+    client_host = request.client.host if request.client else "unknown"
+    queue = None
+    if wait > 0:
+        if not await _acquire_slot(client_host):
+            return _slots_exhausted()
+        # Register before reading the status so no transition can slip between
+        queue = task_events.subscribe(task_id)
     try:
-        # Try to retrieve the result from Redis
-        result_json = redis_service.get_value(f"{task_id}")
-        print(f"Retrieved result_json for task_id {task_id}: {result_json}")
-        if result_json:
-            import json
-
-            result = json.loads(result_json)
-            result["metadata"] = result["metadata"].replace("```javascript\n", "")
-            return TaskResultResponse(
-                task_id=task_id,
-                status=result.get("status", "unknown"),
-                result=result,
+        # Fetch status, payload pointer and Celery's own task meta in one
+        # MGET; the pointer is absent until the task is terminal
+        task_status, payload_json, celery_meta = await redis_service.aclient.mget(
+            f"task_status:{task_id}",
+            f"task_payload:{task_id}",
+            f"celery-task-meta-{task_id}",
+        )
+
+        # A worker killed mid-task (e.g. by the time limit) never writes its
+        # error status, but Celery still records the failure
+        celery_error = _celery_failure(celery_meta)
+        if task_status not in TERMINAL_STATUSES and celery_error is not None:
+            return _struct_response(
+                TaskResultResponse(task_id=task_id, status="error", error=celery_error)
             )
 
-        # If not found, return pending status
-        return TaskResultResponse(
-            task_id=task_id,
-            status="pending",
-            message="Task is still processing or not found",
-        )
+        if task_status not in TERMINAL_STATUSES and queue is not None:
+            task_status = await _wait_for_terminal(queue, min(wait, RESULT_MAX_WAIT))
+            if task_status is not None:
+                payload_json = await redis_service.aget(f"task_payload:{task_id}")
+
+        if task_status not in TERMINAL_STATUSES:
+            return _struct_response(
+                TaskResultResponse(
+                    task_id=task_id,
+                    status="pending",
+                    message="Task is still processing or not found",
+                )
+            )
+
+        # Redis only holds a pointer; the payload itself lives in the store
+        payload = None
+        if payload_json:
+            payload = await asyncio.to_thread(payload_store.get, task_id)
+
+        if payload:
+            # Written by our own worker in its final form, so it is embedded
+            # as is rather than decoded, validated and encoded again
+            return _struct_response(
+                TaskResultResponse(
+                    task_id=task_id,
+                    status=task_status,
+                    result=msgspec.Raw(payload),
+                    has_payload=True,
+                    payload_url=orjson.loads(payload_json)["payload_url"],
+                )
+            )
+
+        return _struct_response(TaskResultResponse(task_id=task_id, status=task_status))
 
     except Exception as e:
         raise HTTPException(
@@ -185,6 +585,36 @@ async def get_task_result(task_id: str) -> TaskResultResponse:
             detail=f"Failed to retrieve task result: {str(e)}",
         )
 
+    finally:
+        if queue is not None:
+            task_events.unsubscribe(task_id, queue)
+            _release_slot(client_host)
+
+
+@router.get("/task-payload/{task_id}")
+async def get_task_payload(task_id: str) -> FileResponse:
+    """
+    Serve the full payload of a finished task straight from the payload store.
+
+    Args:
+        task_id: The ID of the task whose payload to return
+
+    Raises:
+        HTTPException: If the payload does not exist or has expired
+    """
+    try:
+        path = payload_store.path(task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not await asyncio.to_thread(path.is_file):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No payload stored for task {task_id}",
+        )
+
+    return FileResponse(path, media_type="application/json")
+
 
 @router.delete("/task/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_task(task_id: str) -> None:
@@ -198,13 +628,15 @@ async def cancel_task(task_id: str) -> None:
         HTTPException: If task cancellation fails
     """
     try:
-        from app.utils.celery_app import celery_app
-
         # Revoke the Celery task
         celery_app.control.revoke(task_id, terminate=True)
 
-        # Clean up Redis data
-        redis_service.delete_value(f"task_result:{task_id}")
+        # Clean up Redis data, and free the request for a fresh attempt
+        await redis_service.arelease_lock(task_id)
+        await redis_service.aclient.delete(
+            f"task_status:{task_id}", f"task_payload:{task_id}"
+        )
+        await asyncio.to_thread(payload_store.delete, task_id)
 
         return None
 
@@ -216,21 +648,30 @@ async def cancel_task(task_id: str) -> None:
 
 
 @router.get("/health", tags=["health"])
-async def health_check() -> Dict[str, str]:
+async def health_check() -> ORJSONResponse:
     """
     Health check endpoint.
 
     Returns:
         Status of the API
     """
-    try:
-        # Test Redis connection
-        redis_service.client.ping()
-        redis_status = "ok"
-    except Exception:
-        redis_status = "error"
+    global _last_ping_ok
 
-    return {
-        "status": "ok",
-        "redis": redis_status,
-    }
+    # Load balancers poll this often, so reuse a recent successful ping
+    if time.monotonic() - _last_ping_ok < HEALTH_PING_CACHE_TIME:
+        redis_status = "ok"
+    else:
+        try:
+            # Test Redis connection
+            await redis_service.aclient.ping()
+            _last_ping_ok = time.monotonic()
+            redis_status = "ok"
+        except Exception:
+            redis_status = "error"
+
+    return ORJSONResponse(
+        {
+            "status": "ok",
+            "redis": redis_status,
+        }
+    )
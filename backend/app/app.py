@@ -4,8 +4,12 @@ import logging
 from contextlib import asynccontextmanager
 
 from app.api.routes import router
+from app.utils.events import task_events
+from app.utils.redis import redis_service
+from app.utils.settings import settings
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Configure logging
 logging.basicConfig(
@@ -20,9 +24,12 @@ async def lifespan(app: FastAPI):
     """Manage app startup and shutdown."""
     # Startup
     logger.info("Shoptimizer backend starting...")
+    task_events.start()
     yield
     # Shutdown
     logger.info("Shoptimizer backend shutting down...")
+    await task_events.stop()
+    await redis_service.aclose()
 
 
 # Create FastAPI app
@@ -31,15 +38,21 @@ app = FastAPI(
     description="AI-powered 3D product visualization platform for Shopify",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure as needed for production
-    allow_credentials=True,
+    allow_origins=[
+        origin.strip()
+        for origin in settings.ALLOWED_ORIGINS.split(",")
+        if origin.strip()
+    ],
+    allow_credentials=False,  # The frontend does not send cookies
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=600,
 )
 
 # Include routes
@@ -64,5 +77,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop="uvloop",
+        http="httptools",
         log_level="info",
     )
@@ -1,10 +1,7 @@
-def system_prompt_3d_obj(
-    product_name, product_type, product_description, product_tags, theme_style
-):
-    tags_str = ", ".join(product_tags) if product_tags else "None"
-    theme_block = f"\nTheme Style: {theme_style}" if theme_style else ""
+import functools
 
-    system_prompt = f"""You are an expert 3D modeler and Three.js developer who specializes in turning 2D drawings into 3D models.
+# Static parts of the product prompt, built once at import time
+_PROMPT_HEAD = """You are an expert 3D modeler and Three.js developer who specializes in turning 2D drawings into 3D models.
     You are a wise and ancient modeler and developer. You are the best at what you do. Your total compensation is $1.2m with annual refreshers. You've just drank three cups of coffee and are laser focused. Welcome to a new day at your job!
     Your task is to analyze the provided images and create a Three.js object that transforms the 2D image into a realistic 3D representation.
 
@@ -13,10 +10,9 @@ def system_prompt_3d_obj(
     - Only create the main object in the image, all surrounding objects should be ignored
     - The main object should be a 3D model that is a faithful representation of the 2D drawing
 
-    Product Name: {product_name}
-    Product Type: {product_type}
-    Description: {product_description}
-    Tags: {tags_str}{theme_block}
+    """
+
+_PROMPT_TAIL = """
 
     ## TECHNICAL IMPLEMENTATION:    
     - DO NOT import any libraries. They have already been imported for you.
@@ -85,4 +81,24 @@ IMPLEMENTATION (REQUIRED):
     
     """
 
-    return system_prompt
+
+# The static instructions on their own, for use as a system instruction.
+# Every product request then starts with the same prefix, which the model
+# API can serve from its prompt cache instead of processing it each time
+PRODUCT_SYSTEM_PROMPT = _PROMPT_HEAD.rstrip() + _PROMPT_TAIL
+
+
+@functools.lru_cache(maxsize=256)
+def product_prompt_3d_obj(
+    product_name, product_type, product_description, product_tags, theme_style
+):
+    # The per-product part of the prompt, to send with PRODUCT_SYSTEM_PROMPT
+    tags_str = ", ".join(product_tags) if product_tags else "None"
+    theme_block = f"\nTheme Style: {theme_style}" if theme_style else ""
+
+    return (
+        f"Product Name: {product_name}\n"
+        f"Product Type: {product_type}\n"
+        f"Description: {product_description}\n"
+        f"Tags: {tags_str}{theme_block}"
+    )
@@ -1,71 +1,339 @@
 import asyncio
-import base64
-import json
-from io import BytesIO
-from typing import Any, Dict, List, Optional
-import requests
-
-from app.claude.prompt import system_prompt_3d_obj
-from app.config import DEFAULT_TEMP, MAX_TOKENS, AITaskAsync, GenericPromptTask
+import functools
+import hashlib
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+import httpx
+import orjson
+
+from app.claude.prompt import PRODUCT_SYSTEM_PROMPT, product_prompt_3d_obj
+from app.config import (
+    DEFAULT_TEMP,
+    PRODUCT_MAX_TOKENS,
+    SCENE_MAX_TOKENS,
+    AITaskAsync,
+    GenericPromptTask,
+    run_coroutine,
+)
 from app.utils.celery_app import celery_app
 from app.utils.redis import redis_service
 from app.utils.settings import settings
-from google import genai
-from google.genai import types
-from PIL import Image
+from app.utils.storage import MAX_IMAGE_BYTES, image_store
+
+# The Gemini SDK is heavy, so it is only imported once a task needs it rather
+# than by every process that imports this module
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
 
 # Default model configuration for Gemini
 DEFAULT_MODEL = "gemini-3-flash-preview"
 
+# How long deterministic (temperature 0) Gemini responses stay cached
+GEMINI_CACHE_EXPIRY = 86400
+
+
+# System prompt for Three.js scene generation
+_SCENE_SYSTEM_PROMPT = """You are an expert Three.js developer and 3D scene designer specializing in creating immersive product showcase environments.
+
+Your task is to generate a complete Three.js scene that serves as a beautiful environment for displaying Shopify products in glass containers.
+
+## TECHNICAL REQUIREMENTS:
+- Do not import any libraries. They have already been imported (THREE, OrbitControls, etc.)
+- Create a complete Three.js scene with camera, renderer, and lighting
+- Include OrbitControls for user interaction
+- The scene should have designated positions for products in glass containers
+- Implement a ground/floor that matches the theme
+- Add atmospheric elements (lighting, fog, background) that enhance the theme
+- Create an animation loop for any dynamic elements
+- Make the scene responsive to container size
+- Include proper material setup with realistic textures where appropriate
+
+## SCENE STRUCTURE:
+- Create a main display area with multiple product positions
+- Each product position should have a glass container (use THREE.CylinderGeometry or custom geometry)
+- Glass containers should use transparent materials with proper refraction
+- Arrange containers in an aesthetically pleasing layout (grid, circle, or custom based on theme)
+- Add ambient lighting and directional lights to highlight products
+- Include environmental elements that match the shop's theme
+
+## RESPONSE FORMAT:
+Return ONLY valid JavaScript code that creates and animates the Three.js scene.
+Include comments explaining major design decisions.
+Wrap your entire code in backticks with the javascript identifier: ```javascript"""
+
+
+# One Gemini client per worker process, so its connection pool is shared
+# by every task instead of each task paying for a new TLS handshake
+_GEMINI_CLIENT: Optional["genai.Client"] = None
+_CLIENT_LOCK = asyncio.Lock()
+
 
 # Create Gemini client
-async def get_gemini_client():
-    client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-    return client
+async def get_gemini_client() -> "genai.Client":
+    global _GEMINI_CLIENT
+    if _GEMINI_CLIENT is None:
+        async with _CLIENT_LOCK:
+            if _GEMINI_CLIENT is None:
+                from google import genai
+                from google.genai import types
+
+                _GEMINI_CLIENT = genai.Client(
+                    api_key=settings.GOOGLE_API_KEY,
+                    http_options=types.HttpOptions(timeout=60_000),
+                )
+    return _GEMINI_CLIENT
+
+
+# Futures of the cacheable generations currently running in this process,
+# by cache key, so identical concurrent requests share one Gemini call
+_INFLIGHT: Dict[str, asyncio.Future] = {}
+
+
+# Caps concurrent Gemini calls in a worker, so fanned-out tasks queue here
+# instead of tripping the API's rate limit and retrying
+_GEMINI_SEM = asyncio.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+
+# Image types Gemini accepts as inline image data
+GEMINI_IMAGE_MIME_TYPES = (
+    "image/png",
+    "image/jpeg",
+    "image/webp",
+    "image/heic",
+    "image/heif",
+)
+
+
+def _image_mime_type(data: bytes, declared: Optional[str] = None) -> str:
+    """Get the MIME type of encoded image bytes, as long as Gemini accepts it.
+
+    The signature wins over the declared type (e.g. a CDN's Content-Type),
+    which is only used for formats that aren't sniffed here.
+
+    Raises:
+        ValueError: If the image is not a type Gemini accepts
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        mime_type = "image/png"
+    elif data[:3] == b"\xff\xd8\xff":
+        mime_type = "image/jpeg"
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        mime_type = "image/webp"
+    elif data[:4] == b"GIF8":
+        mime_type = "image/gif"
+    else:
+        mime_type = (declared or "").split(";")[0].strip().lower()
+
+    if mime_type not in GEMINI_IMAGE_MIME_TYPES:
+        raise ValueError(
+            f"Unsupported product image type {mime_type or 'unknown'}, "
+            f"Gemini accepts {', '.join(GEMINI_IMAGE_MIME_TYPES)}"
+        )
+    return mime_type
+
+
+# One HTTP client per worker process for image downloads, so repeat
+# downloads from the same CDN reuse pooled keep-alive connections
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=settings.GEMINI_MAX_CONCURRENCY * 2),
+        )
+    return _HTTP_CLIENT
+
+
+async def _download_image(url: str) -> Tuple[bytes, Optional[str]]:
+    """Download an image's encoded bytes and the MIME type it was served as.
+
+    Raises:
+        ValueError: If the image is larger than uploads may be
+    """
+    too_large = ValueError(f"Image at {url} is larger than {MAX_IMAGE_BYTES} bytes")
+    async with get_http_client().stream("GET", url) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+            raise too_large
+
+        # Counted while reading, so a wrong or missing length can't bypass it
+        image = bytearray()
+        async for chunk in response.aiter_bytes():
+            image += chunk
+            if len(image) > MAX_IMAGE_BYTES:
+                raise too_large
+        return bytes(image), response.headers.get("content-type")
+
+
+def _strip_code_fence(text: str) -> str:
+    """Get the code inside the first ``` fence of a model response.
+
+    Plain str.find scans instead of a regex; the language tag line after the
+    opening fence is skipped, and an unclosed fence keeps everything after it.
+    """
+    start = text.find("```")
+    if start == -1:
+        return text
+    body_start = text.find("\n", start) + 1
+    if body_start == 0:
+        return text
+    end = text.find("```", body_start)
+    if end == -1:
+        return text[body_start:]
+    return text[body_start:end].strip()
 
 
 class GeminiTaskAsync(AITaskAsync):
     """Base class for Gemini Celery tasks that use an async functions."""
 
-    _client = None
-
     @property
-    async def client(self):
-        if self._client is None:
-            self._client = await get_gemini_client()
-        return self._client
+    async def client(self) -> "genai.Client":
+        return await get_gemini_client()
+
+    @staticmethod
+    def _cache_key(*parts: Any) -> str:
+        """Get the response cache key for everything that is sent to Gemini."""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode())
+            digest.update(b"\0")
+        return "gemini:" + digest.hexdigest()
+
+    @staticmethod
+    async def _get_cached(cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get a cached generation, or None on a miss or without a cache key."""
+        if cache_key is None:
+            return None
+        cached = await redis_service.aget(cache_key)
+        return orjson.loads(cached) if cached else None
+
+    @staticmethod
+    async def _set_cached(
+        cache_key: Optional[str], generation: Dict[str, Any]
+    ) -> None:
+        """Cache a generation if it has a cache key."""
+        if cache_key is not None:
+            await redis_service.aset_value(
+                cache_key, orjson.dumps(generation), GEMINI_CACHE_EXPIRY
+            )
 
+    async def _generate_once(
+        self,
+        cache_key: Optional[str],
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Run generate unless the same generation is cached or already running.
+
+        Concurrent calls with the same cache key in this process wait for the
+        first one instead of each calling Gemini. Without a key, always runs.
+        """
+        if cache_key is None:
+            return await generate()
+
+        generation = await self._get_cached(cache_key)
+        if generation is not None:
+            return generation
 
-class ShopifyProductTo3DTask(GenericPromptTask, GeminiTaskAsync):
+        inflight = _INFLIGHT.get(cache_key)
+        if inflight is not None:
+            # Shielded so a cancelled waiter doesn't cancel the shared call
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        _INFLIGHT[cache_key] = future
+        try:
+            generation = await generate()
+            await self._set_cached(cache_key, generation)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved, in case no other call was waiting on it
+            future.exception()
+            raise
+        finally:
+            _INFLIGHT.pop(cache_key, None)
+
+        future.set_result(generation)
+        return generation
+
+    async def _generate(
+        self, contents: Any, config: "types.GenerateContentConfig"
+    ) -> Dict[str, Any]:
+        """Stream a generation from Gemini and join its chunks.
+
+        Returns the generated text and token usage, as cached by _set_cached.
+        """
+        client = await self.client
+
+        chunks = []
+        chunk = None
+        async with _GEMINI_SEM:
+            async for chunk in await client.aio.models.generate_content_stream(
+                model=DEFAULT_MODEL, contents=contents, config=config
+            ):
+                chunks.append(chunk.text or "")
+
+        # Usage is reported in full on the final chunk
+        return self._generation("".join(chunks), chunk)
+
+    @staticmethod
+    def _generation(text: str, response: Any) -> Dict[str, Any]:
+        """Pair generated text with the token usage reported on a response."""
+        um = getattr(response, "usage_metadata", None)
+        return {
+            "text": text,
+            "usage": {
+                "input_tokens": getattr(um, "prompt_token_count", 0),
+                "output_tokens": getattr(um, "candidates_token_count", 0),
+                "total_tokens": getattr(um, "total_token_count", 0),
+            },
+        }
+
+
+class ShopifyProductTo3DTaskCls(GenericPromptTask, GeminiTaskAsync):
     """Task to generate 3D product visualizations from Shopify product data."""
 
+    name = "shopify_product_to_3d"
+
     async def _run_async(
         self,
         task_id: str,
         product_data: Dict[str, Any],
         shop_theme: Optional[Dict[str, Any]] = None,
-        max_tokens: int = MAX_TOKENS,
+        max_tokens: int = PRODUCT_MAX_TOKENS,
         temperature: float = DEFAULT_TEMP,
         additional_params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Generate a 3D product visualization from Shopify product data."""
         try:
             # Publish start event
-            redis_service.publish_start_event(task_id)
+            await redis_service.apublish_start_event(task_id)
+            await redis_service.aset_task_status(task_id, "running")
 
-            # Get the Gemini client
-            client = await self.client
+            # additional_params can override the token budget per call
+            max_tokens = (additional_params or {}).get("max_tokens", max_tokens)
 
             # Extract product information
             product_name = product_data.get("title", "Unknown Product")
             product_description = product_data.get("description", "")
             product_type = product_data.get("product_type", "")
             product_tags = product_data.get("tags", [])
-            product_image_url = product_data.get("image_url", "")
-
-            if not product_image_url:
-                print("[ERROR] No image URL provided")
-                return {"status": "error", "error": "No image URL provided"}
 
             # Build the prompt for product generation
             prompt = self._build_product_prompt(
@@ -76,64 +344,55 @@ class ShopifyProductTo3DTask(GenericPromptTask, GeminiTaskAsync):
                 shop_theme,
             )
 
-            # Prepare content with product image if available
-            contents = [prompt]
-            if product_image_url:
-                try:
-                    response = requests.get(product_image_url)
-                    response.raise_for_status()
-
-                    image = Image.open(
-                        BytesIO(base64.b64decode(base64.b64encode(response.content).decode("utf-8")))
-                    )
-                    contents.append(image)
-                except Exception as e:
-                    raise e
-                    print(f"[WARNING] Could not load product image: {str(e)}")
-
-            # config
-            config = types.GenerateContentConfig(
-                response_modalities=["Text"],
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-            )
-
-            # we generate the 3D product visualization
-            response = await client.aio.models.generate_content(
-                model=DEFAULT_MODEL,
-                contents=contents,
-                config=config,
-            )
-
-            # Extract any text content
-            text_content = response.text if hasattr(response, "text") else ""
+            # Only deterministic calls are worth caching or sharing. The image
+            # is keyed on its reference, so a hit skips downloading it as well
+            cache_key = None
+            if temperature == 0:
+                cache_key = self._cache_key(
+                    DEFAULT_MODEL,
+                    PRODUCT_SYSTEM_PROMPT,
+                    prompt,
+                    max_tokens,
+                    product_data.get("image_bytes")
+                    or product_data.get("image_uri")
+                    or product_data.get("image_key")
+                    or product_data.get("image_url"),
+                )
+
+            async def generate() -> Dict[str, Any]:
+                # Prepare content with the product image
+                contents = [prompt, await self._image_content(product_data)]
+
+                from google.genai import types
+
+                # config
+                config = types.GenerateContentConfig(
+                    response_modalities=["Text"],
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                    system_instruction=PRODUCT_SYSTEM_PROMPT,
+                )
+
+                # we generate the 3D product visualization
+                return await self._generate(contents, config)
+
+            generation = await self._generate_once(cache_key, generate)
 
             # Prepare the final response
             final_response = {
                 "status": "success",
+                "kind": "product",
                 "product_id": product_data.get("id"),
                 "product_name": product_name,
-                "metadata": text_content,
+                # Stored unfenced, so it can be served to the frontend as is
+                "metadata": _strip_code_fence(generation["text"]),
                 "model": DEFAULT_MODEL,
-                "usage": {
-                    "input_tokens": getattr(
-                        response.usage_metadata, "prompt_token_count", 0
-                    ),
-                    "output_tokens": getattr(
-                        response.usage_metadata, "candidates_token_count", 0
-                    ),
-                    "total_tokens": getattr(
-                        response.usage_metadata, "total_token_count", 0
-                    ),
-                },
+                "usage": generation["usage"],
                 "task_id": task_id,
             }
 
-            # Publish completion event
-            redis_service.set_complete_value(task_id, final_response)
-
-            # Store the final response in Redis for retrieval
-            redis_service.store_response(task_id, final_response)
+            # Store the final response and publish completion in one round-trip
+            await redis_service.apublish_and_store(task_id, final_response)
 
             return final_response
 
@@ -146,13 +405,49 @@ class ShopifyProductTo3DTask(GenericPromptTask, GeminiTaskAsync):
             }
 
             try:
-                redis_service.publish_error_event(task_id, e)
-                redis_service.store_response(task_id, error_response)
+                await redis_service.apublish_error_event(task_id, e)
+                await redis_service.apublish_and_store(task_id, error_response)
             except Exception:
                 pass
 
             return error_response
 
+    async def _image_content(self, product_data: Dict[str, Any]) -> Any:
+        """Get the product image in a form that can be sent to Gemini.
+
+        ``image_uri`` references and raw ``image_bytes`` (in-process callers
+        only, the Celery payload is JSON) are handed to Gemini directly. An
+        ``image_key`` is read from the image store, and a plain ``image_url``
+        is downloaded; both are sent as bytes.
+        """
+        from google.genai import types
+
+        mime_type = product_data.get("image_mime_type")
+
+        image_uri = product_data.get("image_uri")
+        if image_uri:
+            return types.Part.from_uri(
+                file_uri=image_uri, mime_type=mime_type or "image/jpeg"
+            )
+
+        image_bytes = product_data.get("image_bytes")
+        image_key = product_data.get("image_key")
+        if not image_bytes and image_key:
+            image_bytes = await asyncio.to_thread(image_store.get, image_key)
+            if image_bytes is None:
+                raise ValueError(f"Uploaded image {image_key} has expired")
+        if not image_bytes:
+            image_url = product_data.get("image_url")
+            if not image_url:
+                raise ValueError("No image URL provided")
+            image_bytes, served_type = await _download_image(image_url)
+            mime_type = mime_type or served_type
+
+        # The encoded image goes to Gemini as is, never decoded into pixels
+        return types.Part.from_bytes(
+            data=image_bytes, mime_type=_image_mime_type(image_bytes, mime_type)
+        )
+
     def _build_product_prompt(
         self,
         product_name: str,
@@ -161,32 +456,36 @@ class ShopifyProductTo3DTask(GenericPromptTask, GeminiTaskAsync):
         product_tags: List[str],
         shop_theme: Optional[Dict[str, Any]] = None,
     ) -> str:
-        """Build a detailed prompt for product visualization."""
+        """Build the per-product prompt sent alongside PRODUCT_SYSTEM_PROMPT."""
 
-        prompt = system_prompt_3d_obj(
+        # No theme, an empty one and one without a style all share a cache entry
+        theme_style = (shop_theme or {}).get("style") or ""
+
+        prompt = product_prompt_3d_obj(
             product_name,
             product_type,
             product_description,
-            product_tags,
-            shop_theme,
+            tuple(product_tags or ()),
+            theme_style,
         )
 
         return prompt
 
     def run(
         self,
-        task_id: str,
         product_data: Dict[str, Any],
         shop_theme: Optional[Dict[str, Any]] = None,
-        max_tokens: int = MAX_TOKENS,
+        max_tokens: int = PRODUCT_MAX_TOKENS,
         temperature: float = DEFAULT_TEMP,
         additional_params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Run the task with the given parameters."""
-        loop = asyncio.get_event_loop()
-        result = loop.run_until_complete(
+        """Run the task with the given parameters.
+
+        The task id is the one it was queued under, so Redis keys match ours.
+        """
+        return run_coroutine(
             self._run_async(
-                task_id=task_id,
+                task_id=self.request.id,
                 product_data=product_data,
                 shop_theme=shop_theme,
                 max_tokens=max_tokens,
@@ -194,88 +493,74 @@ class ShopifyProductTo3DTask(GenericPromptTask, GeminiTaskAsync):
                 additional_params=additional_params,
             )
         )
-        return result
 
 
-class ShopifySceneGenerationTask(GenericPromptTask, GeminiTaskAsync):
+class ShopifySceneGenerationTaskCls(GenericPromptTask, GeminiTaskAsync):
     """Task to generate a themed 3D scene for Shopify products."""
 
+    name = "shopify_scene_generation"
+
     async def _run_async(
         self,
         task_id: str,
         shop_data: Dict[str, Any],
-        max_tokens: int = 4096,
+        max_tokens: int = SCENE_MAX_TOKENS,
         temperature: float = DEFAULT_TEMP,
         additional_params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Generate a themed 3D scene based on Shopify shop data."""
         try:
             # Publish start event
-            redis_service.publish_start_event(task_id)
+            await redis_service.apublish_start_event(task_id)
+            await redis_service.aset_task_status(task_id, "running")
 
-            # Get the Gemini client
-            client = await self.client
+            # additional_params can override the token budget per call
+            max_tokens = (additional_params or {}).get("max_tokens", max_tokens)
 
             # Extract shop information
             shop_name = shop_data.get("name", "Shop")
             shop_description = shop_data.get("description", "")
-            theme_colors = shop_data.get("theme", {}).get("colors", {})
-            theme_style = shop_data.get("theme", {}).get("style", "modern")
+            theme = shop_data.get("theme") or {}
+            theme_colors = theme.get("colors") or {}
+            theme_style = theme.get("style") or "modern"
             product_count = shop_data.get("product_count", 1)
 
             # Build the prompt for scene generation
             prompt = self._build_scene_prompt(
-                shop_name, shop_description, theme_colors, theme_style, product_count
+                shop_name,
+                shop_description,
+                tuple(sorted(theme_colors.items())),
+                theme_style,
+                product_count,
             )
 
-            # System prompt for Three.js scene generation
-            system_prompt = """You are an expert Three.js developer and 3D scene designer specializing in creating immersive product showcase environments.
+            # Only deterministic calls are worth caching or sharing
+            cache_key = None
+            if temperature == 0:
+                cache_key = self._cache_key(
+                    DEFAULT_MODEL, _SCENE_SYSTEM_PROMPT, prompt, max_tokens
+                )
 
-Your task is to generate a complete Three.js scene that serves as a beautiful environment for displaying Shopify products in glass containers.
+            async def generate() -> Dict[str, Any]:
+                from google.genai import types
 
-## TECHNICAL REQUIREMENTS:
-- Do not import any libraries. They have already been imported (THREE, OrbitControls, etc.)
-- Create a complete Three.js scene with camera, renderer, and lighting
-- Include OrbitControls for user interaction
-- The scene should have designated positions for products in glass containers
-- Implement a ground/floor that matches the theme
-- Add atmospheric elements (lighting, fog, background) that enhance the theme
-- Create an animation loop for any dynamic elements
-- Make the scene responsive to container size
-- Include proper material setup with realistic textures where appropriate
+                # Create config
+                config = types.GenerateContentConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                    system_instruction=_SCENE_SYSTEM_PROMPT,
+                )
 
-## SCENE STRUCTURE:
-- Create a main display area with multiple product positions
-- Each product position should have a glass container (use THREE.CylinderGeometry or custom geometry)
-- Glass containers should use transparent materials with proper refraction
-- Arrange containers in an aesthetically pleasing layout (grid, circle, or custom based on theme)
-- Add ambient lighting and directional lights to highlight products
-- Include environmental elements that match the shop's theme
-
-## RESPONSE FORMAT:
-Return ONLY valid JavaScript code that creates and animates the Three.js scene.
-Include comments explaining major design decisions.
-Wrap your entire code in backticks with the javascript identifier: ```javascript"""
-
-            # Create config
-            config = types.GenerateContentConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                system_instruction=system_prompt,
-            )
+                # Generate the scene code
+                return await self._generate(prompt, config)
 
-            # Generate the scene code
-            response = await client.aio.models.generate_content(
-                model=DEFAULT_MODEL, contents=prompt, config=config
-            )
-
-            # Extract the generated code
-            scene_code = response.text
+            generation = await self._generate_once(cache_key, generate)
 
             # Prepare the final response
             final_response = {
                 "status": "success",
-                "scene_code": scene_code,
+                "kind": "scene",
+                "scene_code": generation["text"],
                 "shop_name": shop_name,
                 "product_positions": product_count,
                 "theme": {
@@ -283,25 +568,12 @@ Wrap your entire code in backticks with the javascript identifier: ```javascript
                     "colors": theme_colors,
                 },
                 "model": DEFAULT_MODEL,
-                "usage": {
-                    "input_tokens": getattr(
-                        response.usage_metadata, "prompt_token_count", 0
-                    ),
-                    "output_tokens": getattr(
-                        response.usage_metadata, "candidates_token_count", 0
-                    ),
-                    "total_tokens": getattr(
-                        response.usage_metadata, "total_token_count", 0
-                    ),
-                },
+                "usage": generation["usage"],
                 "task_id": task_id,
             }
 
-            # Publish completion event
-            redis_service.publish_complete_event(task_id, final_response)
-
-            # Store the final response in Redis for retrieval
-            redis_service.store_response(task_id, final_response)
+            # Store the final response and publish completion in one round-trip
+            await redis_service.apublish_and_store(task_id, final_response)
 
             return final_response
 
@@ -314,23 +586,27 @@ Wrap your entire code in backticks with the javascript identifier: ```javascript
             }
 
             try:
-                redis_service.publish_error_event(task_id, e)
-                redis_service.store_response(task_id, error_response)
+                await redis_service.apublish_error_event(task_id, e)
+                await redis_service.apublish_and_store(task_id, error_response)
             except Exception:
                 pass
 
             return error_response
 
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _build_scene_prompt(
-        self,
         shop_name: str,
         shop_description: str,
-        theme_colors: Dict[str, str],
+        theme_colors: Tuple[Tuple[str, str], ...],
         theme_style: str,
         product_count: int,
     ) -> str:
-        """Build a detailed prompt for scene generation."""
-        colors_desc = ", ".join([f"{k}: {v}" for k, v in theme_colors.items()])
+        """Build a detailed prompt for scene generation.
+
+        theme_colors is a sorted tuple of (name, color) pairs so it can be cached.
+        """
+        colors_desc = ", ".join([f"{k}: {v}" for k, v in theme_colors])
 
         prompt = f"""Generate a complete Three.js scene for displaying {product_count} products from "{shop_name}".
 
@@ -372,26 +648,130 @@ Return the complete JavaScript code for this Three.js scene."""
 
     def run(
         self,
-        task_id: str,
         shop_data: Dict[str, Any],
         product_count: int,
-        max_tokens: int = 4096,
+        max_tokens: int = SCENE_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMP,
+        additional_params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the task with the given parameters.
+
+        The task id is the one it was queued under, so Redis keys match ours.
+        """
+        return run_coroutine(
+            self._run_async(
+                task_id=self.request.id,
+                shop_data={**shop_data, "product_count": product_count},
+                max_tokens=max_tokens,
+                temperature=temperature,
+                additional_params=additional_params,
+            )
+        )
+
+
+class ShopifyShopPipelineTaskCls(GenericPromptTask, GeminiTaskAsync):
+    """Task to generate a shop's scene and all of its products concurrently."""
+
+    name = "shopify_shop_pipeline"
+
+    async def _run_async(
+        self,
+        task_id: str,
+        shop_data: Dict[str, Any],
+        products: List[Dict[str, Any]],
+        shop_theme: Optional[Dict[str, Any]] = None,
+        max_tokens: int = PRODUCT_MAX_TOKENS,
+        temperature: float = DEFAULT_TEMP,
+        additional_params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Generate the scene and every product visualization in parallel.
+
+        Each part is stored under its own sub-task id, so clients can follow
+        the parts individually as well as the pipeline as a whole.
+        """
+        try:
+            await redis_service.apublish_start_event(task_id)
+            await redis_service.aset_task_status(task_id, "running")
+
+            # The scene and the products don't depend on each other, so the
+            # pipeline takes as long as the slowest call instead of all of them
+            scene_result, *product_results = await asyncio.gather(
+                shopify_scene_generation_task._run_async(
+                    task_id=f"{task_id}-scene",
+                    shop_data={**shop_data, "product_count": len(products)},
+                    temperature=temperature,
+                    additional_params=additional_params,
+                ),
+                *[
+                    shopify_product_to_3d_task._run_async(
+                        task_id=f"{task_id}-product-{idx}",
+                        product_data=product,
+                        shop_theme=shop_theme,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        additional_params=additional_params,
+                    )
+                    for idx, product in enumerate(products)
+                ],
+            )
+
+            results = [scene_result, *product_results]
+            failed = [r["task_id"] for r in results if r["status"] != "success"]
+
+            final_response = {
+                "status": "error" if failed else "success",
+                "kind": "shop",
+                "scene": scene_result,
+                "products": product_results,
+                "task_id": task_id,
+            }
+            if failed:
+                final_response["error"] = f"Sub-tasks failed: {', '.join(failed)}"
+
+            await redis_service.apublish_and_store(task_id, final_response)
+
+            return final_response
+
+        except Exception as e:
+            error_response = {
+                "status": "error",
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "task_id": task_id,
+            }
+
+            try:
+                await redis_service.apublish_error_event(task_id, e)
+                await redis_service.apublish_and_store(task_id, error_response)
+            except Exception:
+                pass
+
+            return error_response
+
+    def run(
+        self,
+        shop_data: Dict[str, Any],
+        products: List[Dict[str, Any]],
+        shop_theme: Optional[Dict[str, Any]] = None,
+        max_tokens: int = PRODUCT_MAX_TOKENS,
         temperature: float = DEFAULT_TEMP,
         additional_params: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Run the task with the given parameters."""
-        loop = asyncio.get_event_loop()
-        result = loop.run_until_complete(
+        """Run the task with the given parameters.
+
+        The task id is the one it was queued under, so Redis keys match ours.
+        """
+        return run_coroutine(
             self._run_async(
-                task_id=task_id,
+                task_id=self.request.id,
                 shop_data=shop_data,
-                product_count=product_count,
+                products=products,
+                shop_theme=shop_theme,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 additional_params=additional_params,
             )
         )
-        return result
 
 
 # class ShopifyProductIntegrationTask(GenericPromptTask, GeminiTaskAsync):
@@ -567,15 +947,13 @@ Return the complete JavaScript code for this Three.js scene."""
 #         return result
 
 
-# Register the tasks properly with Celery
-ShopifyProductTo3DTask = celery_app.register_task(ShopifyProductTo3DTask())
-ShopifySceneGenerationTask = celery_app.register_task(ShopifySceneGenerationTask())
+# Register the tasks properly with Celery. Each task has exactly one
+# instance, so the names below are the ones to call and queue on
+shopify_product_to_3d_task = celery_app.register_task(ShopifyProductTo3DTaskCls())
+shopify_scene_generation_task = celery_app.register_task(
+    ShopifySceneGenerationTaskCls()
+)
+shopify_shop_pipeline_task = celery_app.register_task(ShopifyShopPipelineTaskCls())
 # ShopifyProductIntegrationTask = celery_app.register_task(
 #     ShopifyProductIntegrationTask()
 # )
-
-
-if __name__ == "__main__":
-    prod = ShopifyProductTo3DTask()
-
-    prod.run()
@@ -1,10 +1,46 @@
-MAX_TOKENS = 409600
+# Output token budgets, kept within Gemini's output window
+MAX_TOKENS = 8192
+SCENE_MAX_TOKENS = 4096
+PRODUCT_MAX_TOKENS = 2048
 DEFAULT_TEMP = 0
 import asyncio
-from typing import Any, Dict, Optional, Protocol
+import threading
+from typing import Any, Coroutine, Dict, Optional, Protocol
 
 from app.utils.redis import redis_service
 from celery import Task
+from celery.signals import worker_process_init
+
+# Persistent event loop for the worker process. Running every task on the
+# same loop keeps async clients, and their pooled connections, usable
+# across tasks instead of tying them to a loop that closes after one run.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    """Start the worker's event loop in a daemon thread if it is not running."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="ai-task-loop", daemon=True
+            ).start()
+            _LOOP = loop
+    return _LOOP
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs) -> None:
+    _start_loop()
+
+
+def run_coroutine(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the worker's event loop and wait for its result."""
+    # Started lazily too, since worker_process_init only fires in prefork children
+    loop = _LOOP or _start_loop()
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
 
 class AsyncClient(Protocol):
@@ -15,14 +51,12 @@ class AsyncClient(Protocol):
 class AITaskAsync(Task):
     """Base Celery tasks class that use async functions."""
 
-    _client = None
-
     @property
     async def client(self) -> AsyncClient:
         raise NotImplementedError
 
     def run(self, *args, **kwargs):
-        return asyncio.run(self._run_async(*args, **kwargs))
+        return run_coroutine(self._run_async(*args, **kwargs))
 
     async def _run_async(self, *args, **kwargs):
         raise NotImplementedError
@@ -40,7 +74,8 @@ class GenericPromptTask(AITaskAsync):
         additional_params: Optional[Dict[str, Any]] = None,
     ):
         try:
-            redis_service.publish_start_event(task_id)
+            await redis_service.apublish_start_event(task_id)
+            await redis_service.aset_task_status(task_id, "running")
 
             #  message parameters
             message_params = self.prepare_message_params(
@@ -59,9 +94,7 @@ class GenericPromptTask(AITaskAsync):
 
             final_response = self.prepare_final_response(task_id, response, content)
 
-            redis_service.publish_complete_event(task_id, final_response)
-
-            redis_service.store_response(task_id, final_response)
+            await redis_service.apublish_and_store(task_id, final_response)
 
             return final_response
 
@@ -76,8 +109,8 @@ class GenericPromptTask(AITaskAsync):
 
             try:
 
-                redis_service.publish_error_event(task_id, e)
-                redis_service.store_response(task_id, error_response)
+                await redis_service.apublish_error_event(task_id, e)
+                await redis_service.apublish_and_store(task_id, error_response)
             except Exception:
                 pass
 
@@ -1,12 +1,23 @@
-import os
-import sys
-
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-
+import orjson
 from celery import Celery
+from kombu.serialization import register
 
 from app.utils.settings import settings
 
+# Imported under any other name this module would build a second Celery app,
+# with its own broker connections, in the same process
+if __name__ != "app.utils.celery_app":
+    raise ImportError(f"Import the Celery app as app.utils.celery_app, not {__name__}")
+
+# orjson encodes task messages and results several times faster than json
+register(
+    "orjson",
+    lambda obj: orjson.dumps(obj).decode(),
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="utf-8",
+)
+
 celery_app = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
@@ -16,11 +27,19 @@ celery_app = Celery(
 
 # Optional: Configure Celery
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
     enable_utc=True,
-    task_track_started=True,
     task_time_limit=600,  # 10 minutes
     worker_concurrency=4,
+    # Tasks publish their status and results to our own Redis keys, so the
+    # result backend only records failures a worker could not report itself
+    # (e.g. time limit kills), for as long as our task status lives
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=True,
+    result_expires=3600,
+    # Results are read from our own Redis keys, never through AsyncResult,
+    # so the backend's LRU result cache would only hold memory
+    result_cache_max=-1,
 )
@@ -0,0 +1,98 @@
+"""Fan-out of task status events from Redis to SSE connections."""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Set
+
+from app.utils.redis import redis_service
+
+logger = logging.getLogger(__name__)
+
+# Channel pattern the worker publishes task status changes on
+TASK_EVENTS_PATTERN = "task_events:*"
+
+# Last item a queue receives when its consumer fell too far behind; the
+# consumer should close so the client reconnects and resyncs from Redis
+QUEUE_OVERFLOW = "overflow"
+
+
+class TaskEventDispatcher:
+    """Single Redis pattern subscriber that feeds per-task asyncio queues."""
+
+    def __init__(self, queue_size: int = 16, max_dropped: int = 64):
+        self.queue_size = queue_size
+        self.max_dropped = max_dropped
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._dropped: Dict[asyncio.Queue, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background dispatcher on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        """Cancel the background dispatcher."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Register a queue that receives status changes for a task."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        """Remove a queue registered with subscribe."""
+        queues = self._subscribers.get(task_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        self._dropped.pop(queue, None)
+        if not queues:
+            del self._subscribers[task_id]
+
+    async def _dispatch(self) -> None:
+        """Forward every task event to the queues waiting on that task."""
+        while True:
+            pubsub = redis_service.aclient.pubsub()
+            try:
+                await pubsub.psubscribe(TASK_EVENTS_PATTERN)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    task_id = message["channel"].split(":", 1)[1]
+                    # Copied since an overflowing queue unsubscribes itself
+                    for queue in list(self._subscribers.get(task_id, ())):
+                        self._put_latest(task_id, queue, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task event subscription lost, reconnecting")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _put_latest(self, task_id: str, queue: asyncio.Queue, item: str) -> None:
+        """Enqueue an event, dropping the oldest one if the queue is full.
+
+        The newest event is never dropped, so a terminal status always gets
+        through. A queue that keeps overflowing is sent QUEUE_OVERFLOW and
+        unsubscribed instead of buffering for a consumer that can't keep up.
+        """
+        if queue.full():
+            queue.get_nowait()
+            self._dropped[queue] = self._dropped.get(queue, 0) + 1
+            if self._dropped[queue] > self.max_dropped:
+                self.unsubscribe(task_id, queue)
+                item = QUEUE_OVERFLOW
+        queue.put_nowait(item)
+
+
+# Create a singleton instance
+task_events = TaskEventDispatcher()
@@ -1,10 +1,36 @@
-import json
+import asyncio
 import time
 from typing import Any, Dict
 
+import orjson
 from redis import Redis
+from redis import asyncio as aioredis
 
 from app.utils.settings import settings
+from app.utils.storage import payload_store
+
+# Claims a dedup lock for a task unless another live owner holds it. ARGV[2]
+# is the owner a takeover expects to replace ("" for a fresh claim), so two
+# concurrent takeovers cannot both win. The new task is marked queued in the
+# same step, so nobody sees the lock before the owner's status exists.
+_CLAIM_LOCK = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[2] then
+    return owner
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], KEYS[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[3], 'queued', 'EX', ARGV[4])
+return ARGV[1]
+"""
+
+# Releases a dedup lock only if it still belongs to the given task
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+return redis.call('DEL', KEYS[2])
+"""
 
 
 class RedisService:
@@ -13,25 +39,68 @@ class RedisService:
     def __init__(self):
         self.host = settings.REDIS_HOST
         self.port = settings.REDIS_PORT
+        self.max_connections = settings.REDIS_MAX_CONNECTIONS
         self._client = None
+        self._aclient = None
 
     @property
     def client(self) -> Redis:
         """Get a Redis client instance."""
         if self._client is None:
-            self._client = Redis(host=self.host, port=self.port, decode_responses=True)
+            self._client = Redis(
+                host=self.host,
+                port=self.port,
+                decode_responses=True,
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
         return self._client
 
+    @property
+    def aclient(self) -> aioredis.Redis:
+        """Get an asyncio Redis client instance for use inside the event loop.
+
+        Its pool blocks for a free connection when exhausted, so bursts queue
+        up briefly instead of failing with "Too many connections".
+        """
+        if self._aclient is None:
+            pool = aioredis.BlockingConnectionPool.from_url(
+                f"redis://{self.host}:{self.port}",
+                max_connections=self.max_connections,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                decode_responses=True,
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
+            # from_pool hands the pool to the client, so aclose() closes it too
+            self._aclient = aioredis.Redis.from_pool(pool)
+        return self._aclient
+
+    async def aclose(self) -> None:
+        """Close the asyncio Redis client and its connection pool."""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def apipeline(self) -> aioredis.client.Pipeline:
+        """Get a non-transactional asyncio pipeline to batch commands into one RTT."""
+        return self.aclient.pipeline(transaction=False)
+
     def get_value(self, key: str) -> str:
         """Get a value from Redis."""
         return self.client.get(key)
 
+    async def aget(self, key: str) -> str:
+        """Get a value from Redis without blocking the event loop."""
+        return await self.aclient.get(key)
+
     def set_value(self, key: str, value: str, expiry: int = None) -> bool:
         """Set a value in Redis with optional expiry in seconds."""
-        result = self.client.set(key, value)
-        if expiry:
-            self.client.expire(key, expiry)
-        return result
+        return self.client.set(key, value, ex=expiry or None)
+
+    async def aset_value(self, key: str, value: str, expiry: int = None) -> bool:
+        """Set a value in Redis without blocking the event loop."""
+        return await self.aclient.set(key, value, ex=expiry or None)
 
     def delete_value(self, key: str) -> int:
         """Delete a value from Redis."""
@@ -50,14 +119,147 @@ class RedisService:
     def publish_event(self, task_id: str, event_type: str, data: Dict[str, Any]) -> int:
         """Publish an event to a task's stream channel."""
         event = {"event": event_type, "data": data}
-        return self.publish(f"task_stream:{task_id}", json.dumps(event))
+        return self.publish(f"task_stream:{task_id}", orjson.dumps(event))
+
+    async def apublish_event(
+        self, task_id: str, event_type: str, data: Dict[str, Any]
+    ) -> int:
+        """Async variant of publish_event for use inside the event loop."""
+        event = {"event": event_type, "data": data}
+        return await self.aclient.publish(
+            f"task_stream:{task_id}", orjson.dumps(event)
+        )
+
+    def publish_and_store(
+        self,
+        task_id: str,
+        response_data: Dict[str, Any],
+        expiry: int = 1800,
+        status_expiry: int = 3600,
+    ) -> list:
+        """Store a task's final response and publish its status in one round-trip.
+
+        The response goes to the payload store; Redis gets a pointer to it
+        and the task status, taken from the response's ``status`` field.
+        """
+        return self.publish_and_store_raw(
+            task_id,
+            orjson.dumps(response_data),
+            response_data.get("status", "unknown"),
+            expiry,
+            status_expiry,
+        )
+
+    def publish_and_store_raw(
+        self,
+        task_id: str,
+        payload: bytes,
+        task_status: str,
+        expiry: int = 1800,
+        status_expiry: int = 3600,
+    ) -> list:
+        """Like publish_and_store, for a response that is already serialized."""
+        payload_store.put(task_id, payload)
+        pipe = self.client.pipeline(transaction=False)
+        self._queue_result(pipe, task_id, task_status, expiry, status_expiry)
+        return pipe.execute()
 
-    def store_response(
-        self, task_id: str, response_data: Dict[str, Any], expiry: int = 3600
-    ) -> bool:
-        """Store a response in Redis with expiry."""
-        key = f"task_response:{task_id}"
-        return self.set_value(key, json.dumps(response_data), expiry)
+    async def apublish_and_store(
+        self,
+        task_id: str,
+        response_data: Dict[str, Any],
+        expiry: int = 1800,
+        status_expiry: int = 3600,
+    ) -> list:
+        """Async variant of publish_and_store for use inside the event loop."""
+        return await self.apublish_and_store_raw(
+            task_id,
+            orjson.dumps(response_data),
+            response_data.get("status", "unknown"),
+            expiry,
+            status_expiry,
+        )
+
+    async def apublish_and_store_raw(
+        self,
+        task_id: str,
+        payload: bytes,
+        task_status: str,
+        expiry: int = 1800,
+        status_expiry: int = 3600,
+    ) -> list:
+        """Async variant of publish_and_store_raw for use inside the event loop."""
+        await asyncio.to_thread(payload_store.put, task_id, payload)
+        pipe = self.apipeline()
+        self._queue_result(pipe, task_id, task_status, expiry, status_expiry)
+        return await pipe.execute()
+
+    @staticmethod
+    def _queue_result(
+        pipe: Any,
+        task_id: str,
+        task_status: str,
+        expiry: int,
+        status_expiry: int,
+    ) -> None:
+        """Queue the payload pointer, status and status event of a finished task."""
+        pointer = {
+            "status": task_status,
+            "task_id": task_id,
+            "payload_url": f"/api/task-payload/{task_id}",
+        }
+        pipe.set(f"task_payload:{task_id}", orjson.dumps(pointer), ex=expiry)
+        pipe.set(f"task_status:{task_id}", task_status, ex=status_expiry)
+        pipe.publish(f"task_events:{task_id}", task_status)
+
+    def set_task_status(self, task_id: str, status: str, expiry: int = 3600) -> int:
+        """Store a task's status and notify SSE subscribers of the change."""
+        self.set_value(f"task_status:{task_id}", status, expiry)
+        return self.publish(f"task_events:{task_id}", status)
+
+    async def aset_task_status(
+        self, task_id: str, status: str, expiry: int = 3600
+    ) -> int:
+        """Async variant of set_task_status for use inside the event loop."""
+        pipe = self.apipeline()
+        pipe.set(f"task_status:{task_id}", status, ex=expiry)
+        pipe.publish(f"task_events:{task_id}", status)
+        _, receivers = await pipe.execute()
+        return receivers
+
+    async def aclaim_lock(
+        self,
+        lock_key: str,
+        task_id: str,
+        expected_owner: str = "",
+        expiry: int = 1800,
+        status_expiry: int = 3600,
+    ) -> str:
+        """Claim a dedup lock for a task and return the task that owns it.
+
+        With ``expected_owner`` the lock is taken over from that task, as long
+        as nobody else has replaced it in the meantime. The winner's status is
+        set to queued and the lock is recorded under ``task_lock_of:{task_id}``
+        so it can be released by task id.
+        """
+        return await self.aclient.eval(
+            _CLAIM_LOCK,
+            3,
+            lock_key,
+            f"task_lock_of:{task_id}",
+            f"task_status:{task_id}",
+            task_id,
+            expected_owner,
+            expiry,
+            status_expiry,
+        )
+
+    async def arelease_lock(self, task_id: str, lock_key: str = None) -> None:
+        """Release the dedup lock held by a task, if it still holds one."""
+        lock_of_key = f"task_lock_of:{task_id}"
+        lock_key = lock_key or await self.aclient.get(lock_of_key)
+        if lock_key:
+            await self.aclient.eval(_RELEASE_LOCK, 2, lock_key, lock_of_key, task_id)
 
     def publish_start_event(self, task_id: str) -> int:
         """Publish a start event for a task."""
@@ -65,11 +267,11 @@ class RedisService:
             task_id, "start", {"task_id": task_id, "timestamp": time.time()}
         )
 
-    def set_complete_value(
-        self, task_id: str, response_data: Dict[str, Any]
-    ) -> int:
-        """Publish a completion event for a task."""
-        return self.set_value(task_id, json.dumps(response_data))
+    async def apublish_start_event(self, task_id: str) -> int:
+        """Publish a start event for a task without blocking the event loop."""
+        return await self.apublish_event(
+            task_id, "start", {"task_id": task_id, "timestamp": time.time()}
+        )
 
     def publish_error_event(self, task_id: str, error: Exception) -> int:
         """Publish an error event for a task."""
@@ -81,6 +283,16 @@ class RedisService:
         }
         return self.publish_event(task_id, "error", error_data)
 
+    async def apublish_error_event(self, task_id: str, error: Exception) -> int:
+        """Publish an error event for a task without blocking the event loop."""
+        error_data = {
+            "status": "error",
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "task_id": task_id,
+        }
+        return await self.apublish_event(task_id, "error", error_data)
+
 
 # Create a singleton instance
 redis_service = RedisService()
@@ -1,30 +1,49 @@
 """Configuration settings for the backend."""
 
-# TODO: WTF?
-import os
+from functools import lru_cache
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    """Application settings."""
+    """Application settings, read from the environment and .env once."""
+
+    model_config = SettingsConfigDict(
+        env_file=".env", case_sensitive=True, frozen=True
+    )
 
     # Google Gemini AI
-    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
+    GOOGLE_API_KEY: str = ""
+    # Concurrent Gemini calls per worker process, sized to the project's quota
+    GEMINI_MAX_CONCURRENCY: int = 10
 
     # Redis Configuration
-    REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
-    REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    # Size to uvicorn workers x expected concurrent requests per worker
+    REDIS_MAX_CONNECTIONS: int = 64
+    # Seconds to wait for a free pooled connection before giving up
+    REDIS_POOL_TIMEOUT: float = 5.0
+
+    # Comma-separated origins allowed to call the API from a browser
+    ALLOWED_ORIGINS: str = "http://localhost:3000"
+
+    # Task payload storage, shared between the API and workers
+    PAYLOAD_STORE_DIR: str = "payloads"
+
+    # SSE admission control
+    SSE_MAX_CONNECTIONS: int = 512
+    SSE_MAX_PER_CLIENT: int = 8
 
     # Celery Configuration
-    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
-    CELERY_RESULT_BACKEND: str = os.getenv(
-        "CELERY_RESULT_BACKEND", "redis://localhost:6379/0"
-    )
+    CELERY_BROKER_URL: str = "redis://localhost:6379/0"
+    CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the settings, parsed on first use and shared afterwards."""
+    return Settings()
 
 
-settings = Settings()
+settings = get_settings()
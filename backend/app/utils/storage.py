@@ -0,0 +1,91 @@
+"""Storage for task payloads that are too large to keep in Redis."""
+
+import itertools
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from app.utils.settings import settings
+
+# Largest product image accepted, whether uploaded or downloaded by a worker
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+
+class PayloadStore:
+    """Stores task payloads as files in a directory shared by the API and workers."""
+
+    def __init__(
+        self,
+        root: str,
+        expiry: int = 1800,
+        purge_interval: int = 300,
+        suffix: str = ".json",
+    ):
+        self.root = Path(root)
+        self.expiry = expiry
+        self.purge_interval = purge_interval
+        self.suffix = suffix
+        self._last_purge = 0.0
+
+    def path(self, task_id: str) -> Path:
+        """Get the file path of a task's payload."""
+        # task_id comes from the URL, so never let it escape the store root
+        if not task_id or os.path.basename(task_id) != task_id or task_id == "..":
+            raise ValueError(f"Invalid task id: {task_id!r}")
+        return self.root / f"{task_id}{self.suffix}"
+
+    def put(self, task_id: str, data: bytes) -> Path:
+        """Write a task's payload atomically and return its path."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(task_id)
+        # Unique per writer, as concurrent puts of one key must not share it
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._maybe_purge()
+        return path
+
+    def get(self, task_id: str) -> Optional[bytes]:
+        """Read a task's payload, or None if it does not exist."""
+        try:
+            return self.path(task_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, task_id: str) -> None:
+        """Delete a task's payload if it exists."""
+        self.path(task_id).unlink(missing_ok=True)
+
+    def _maybe_purge(self) -> None:
+        """Delete payloads older than the expiry, at most once per purge interval.
+
+        Tmp files left behind by writers that died mid-put expire the same way.
+        """
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        paths = itertools.chain(
+            self.root.glob(f"*{self.suffix}"), self.root.glob(f"*{self.suffix}.*.tmp")
+        )
+        for path in paths:
+            try:
+                if now - path.stat().st_mtime > self.expiry:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Create singleton instances
+payload_store = PayloadStore(settings.PAYLOAD_STORE_DIR)
+# Raw product image uploads, keyed by content hash, kept for as long as a
+# task may wait in the queue
+image_store = PayloadStore(
+    os.path.join(settings.PAYLOAD_STORE_DIR, "images"), expiry=3600, suffix=".img"
+)
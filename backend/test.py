@@ -1,22 +1,22 @@
-import base64
-import re
 import time
 
-import requests
+import orjson
 from app.claude.scene_generation import (
-    ShopifyProductTo3DTask,
-    ShopifySceneGenerationTask,
+    shopify_product_to_3d_task,
+    shopify_scene_generation_task,
 )
 from app.utils.redis import redis_service
+from app.utils.storage import payload_store
 
 
 def extract_javascript_code(metadata_string):
-    # This regex looks for content between ```javascript and ```
-    pattern = r"```javascript\n(.*?)```"
-    match = re.search(pattern, metadata_string, re.DOTALL)
-
-    if match:
-        return match.group(1).strip()
+    # Content between the opening ``` fence line (```javascript) and the next ```
+    start = metadata_string.find("```")
+    if start != -1:
+        body_start = metadata_string.find("\n", start) + 1
+        end = metadata_string.find("```", body_start)
+        if body_start and end != -1:
+            return metadata_string[body_start:end].strip()
 
     # Fallback: if no tags found, return the original string
     # (or handle it as an error)
@@ -25,26 +25,22 @@ def extract_javascript_code(metadata_string):
 
 image_url = "https://www.houseplant.com/cdn/shop/files/Q42024_PDP_Standing_Ashtray_1_1512x.jpg?v=1759936813"
 
-response = requests.get(image_url)
-print(response.content)
-response.raise_for_status()
-
-encoded_string = base64.b64encode(response.content).decode("utf-8")
-
 products_dict = {
     "product_name": "Ash and Scent Set",
     "product_description": "Curated by Seth and inspired by his trip to Grasse, France. Hand-sculpted marble ashtray that doubles as an incense burner. Meet your new go-to for sparking up in style. With 64× droplets included, that’s 640+ minutes of luxurious aromatic escape.",
+    # The worker downloads the image itself, so it isn't fetched or encoded here
     "image_url": image_url,
-    "image_base64": encoded_string,
 }
 
-result = ShopifyProductTo3DTask.apply_async(args=(1, products_dict))
+result = shopify_product_to_3d_task.apply_async(args=(products_dict,))
 
-while not result.ready():
+# Celery ignores task results, so poll the status the worker publishes itself
+while redis_service.get_value(f"task_status:{result.id}") not in ("success", "error"):
     print("Task is still processing... (polling)")
     time.sleep(5)
 
-final = result.result
+# The full response is in the payload store
+final = orjson.loads(payload_store.get(result.id))
 raw_code = final["metadata"]
 
 
@@ -53,5 +49,5 @@ js_code = extract_javascript_code(raw_code)
 print("--- Extracted JS Code ---")
 print([js_code])  # Preview
 
-# result = ShopifyProductTo3DTask.run(1, products_dict)
+# result = shopify_product_to_3d_task.run(products_dict)
 # print(result)
@@ -1,14 +1,20 @@
 # Run Celery worker for processing Claude requests
 import os
 
-from app.utils.celery_app import celery_app
-
 
 def run_worker():
-    """Start the Celery worker process."""
-    celery_command = "celery -A worker worker --loglevel=info"
-    print(f"Starting Celery worker with command: {celery_command}")
-    os.system(celery_command)
+    """Replace this process with the Celery worker process."""
+    celery_command = [
+        "celery",
+        "-A",
+        "app.utils.celery_app:celery_app",
+        "worker",
+        "--loglevel=info",
+    ]
+    print(f"Starting Celery worker with command: {' '.join(celery_command)}")
+    # exec rather than a shell: no extra shell or child process, and signals
+    # from the container runtime reach the worker directly
+    os.execvp(celery_command[0], celery_command)
 
 
 if __name__ == "__main__":